@@ -1,25 +1,24 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request
 from flask_cors import CORS
+import asyncio
+import hashlib
+import orjson
 import os
 from dotenv import load_dotenv
 import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from functools import lru_cache
 
 # Load environment variables
 load_dotenv()
 
-# Import custom modules
-try:
-    from twitter_api import TwitterAnalyzer
-except ImportError:
-    TwitterAnalyzer = None
-    
+# Import custom modules (tweepy and pandas are imported lazily, see below)
 from instagram_api import InstagramAnalyzer
-try:
-    from data_processor import DataProcessor
-except ImportError:
-    # Fallback to simple version without pandas
-    from data_processor_simple import DataProcessor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -35,15 +34,124 @@ CORS(app)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
 
 # Initialize analyzers
-twitter_analyzer = TwitterAnalyzer() if TwitterAnalyzer else None
 instagram_analyzer = InstagramAnalyzer()
-data_processor = DataProcessor()
+
+@lru_cache(maxsize=None)
+def get_twitter_analyzer():
+    """Create the Twitter analyzer on first use, or None if tweepy is missing"""
+    try:
+        from twitter_api import TwitterAnalyzer
+    except ImportError:
+        return None
+    return TwitterAnalyzer()
+
+@lru_cache(maxsize=None)
+def get_data_processor():
+    """Create the data processor on first use so pandas is only imported for analyses"""
+    try:
+        from data_processor import DataProcessor
+    except ImportError:
+        # Fallback to simple version without pandas
+        from data_processor_simple import DataProcessor
+    return DataProcessor()
+
+# CPU-bound pandas/regex processing runs in worker processes so concurrent
+# requests are not serialized on the GIL (workers start on first use)
+# Workers must not be forked from a process that already runs server threads,
+# so use forkserver where available (spawn elsewhere, e.g. Windows)
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', os.cpu_count() or 1))
+ANALYSIS_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+analysis_executor = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS, mp_context=ANALYSIS_MP_CONTEXT)
+_analysis_executor_lock = threading.Lock()
+
+def replace_broken_executor(broken):
+    """Swap in a fresh worker pool after a worker died, unless another request already did"""
+    global analysis_executor
+    with _analysis_executor_lock:
+        if analysis_executor is broken:
+            logger.warning("Analysis worker pool broke, starting a new one")
+            broken.shutdown(wait=False)
+            analysis_executor = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS, mp_context=ANALYSIS_MP_CONTEXT)
+        return analysis_executor
+
+async def run_analysis(func, *args):
+    """Run func in the worker pool, retrying once on a fresh pool if a worker died"""
+    loop = asyncio.get_running_loop()
+    executor = analysis_executor
+    try:
+        return await loop.run_in_executor(executor, func, *args)
+    except BrokenProcessPool:
+        return await loop.run_in_executor(replace_broken_executor(executor), func, *args)
+
+# Analysis result cache: (platform, username, period, analysis_types) -> (expires_at, result)
+ANALYSIS_CACHE_TTL = int(os.getenv('ANALYSIS_CACHE_TTL', '300'))  # seconds, 0 disables
+# Processed results keyed by a fingerprint of the fetched data can only be reused for
+# identical input, so they are kept longer than request-level results
+PROCESSED_CACHE_TTL = int(os.getenv('PROCESSED_CACHE_TTL', '1800'))  # seconds, 0 disables
+ANALYSIS_CACHE_MAXSIZE = 1024
+_analysis_cache = {}
+_analysis_cache_lock = threading.Lock()
+
+def get_cached_analysis(key):
+    """Return a cached analysis result, or None if missing or expired"""
+    with _analysis_cache_lock:
+        entry = _analysis_cache.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del _analysis_cache[key]
+            return None
+        
+        return result
+
+def set_cached_analysis(key, result, ttl=ANALYSIS_CACHE_TTL):
+    """Store an analysis result for ttl seconds"""
+    if ttl <= 0:
+        return
+    
+    with _analysis_cache_lock:
+        now = time.monotonic()
+        if key not in _analysis_cache and len(_analysis_cache) >= ANALYSIS_CACHE_MAXSIZE:
+            # Drop expired entries first, then the oldest one if still full
+            for expired_key in [k for k, (expires_at, _) in _analysis_cache.items() if expires_at < now]:
+                del _analysis_cache[expired_key]
+            if len(_analysis_cache) >= ANALYSIS_CACHE_MAXSIZE:
+                _analysis_cache.pop(next(iter(_analysis_cache)))
+        
+        _analysis_cache[key] = (now + ttl, result)
+
+def data_fingerprint(user_data, posts):
+    """Digest of the fetched user and posts, changing whenever any field (metrics included) does"""
+    data = orjson.dumps([user_data, posts], option=JSON_OPTIONS | orjson.OPT_SORT_KEYS, default=str)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+async def process_posts(method_name, platform, user_data, posts, analysis_types):
+    """Run a DataProcessor method in the worker pool, reusing the result while the fetched data is unchanged"""
+    # Refetching after the request-level entry expires often returns the same data
+    # (the tweet store and the HTTP cache serve it), which then skips the reprocessing
+    key = ('processed', platform, tuple(sorted(analysis_types)), data_fingerprint(user_data, posts))
+    result = get_cached_analysis(key)
+    if result is None:
+        result = await run_analysis(getattr(get_data_processor(), method_name), user_data, posts, analysis_types)
+        if 'error' not in result:
+            set_cached_analysis(key, result, PROCESSED_CACHE_TTL)
+    return result
+
+# orjson handles numpy scalars/arrays from the analyzers natively
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def json_response(obj, status=200):
+    """Serialize obj with orjson into a JSON response"""
+    return Response(orjson.dumps(obj, option=JSON_OPTIONS), status=status, mimetype='application/json')
 
 # Add tojsonfilter
-from json import dumps
 @app.template_filter('tojsonfilter')
 def tojson_filter(obj):
-    return dumps(obj)
+    return orjson.dumps(obj, option=JSON_OPTIONS).decode('utf-8')
 
 @app.route('/')
 def index():
@@ -51,14 +159,14 @@ def index():
     return render_template('index.html')
 
 @app.route('/api/analyze', methods=['POST'])
-def analyze():
+async def analyze():
     """Analyze SNS data"""
     try:
         data = request.get_json()
         
         # Validate input
         if not data or not all(key in data for key in ['platform', 'username', 'period']):
-            return jsonify({'error': 'Missing required parameters'}), 400
+            return json_response({'error': 'Missing required parameters'}, 400)
         
         platform = data['platform']
         username = data['username']
@@ -67,23 +175,32 @@ def analyze():
         
         logger.info(f"Starting analysis for {platform}/@{username} for {period} days")
         
-        if platform == 'twitter':
+        cache_key = (platform, username.lstrip('@').lower(), period, tuple(sorted(analysis_types)))
+        result = get_cached_analysis(cache_key)
+        
+        if result is not None:
+            logger.info(f"Using cached analysis for {platform}/@{username} for {period} days")
+        
+        elif platform == 'twitter':
+            twitter_analyzer = get_twitter_analyzer()
             if not twitter_analyzer:
-                return jsonify({'error': 'Twitter API not available (missing dependencies)'}), 501
+                return json_response({'error': 'Twitter API not available (missing dependencies)'}, 501)
             
-            # Get Twitter data
-            user_data = twitter_analyzer.get_user_info(username)
+            # Get Twitter data (user info and tweets are independent, fetch concurrently)
+            user_data, tweets_data = await asyncio.gather(
+                asyncio.to_thread(twitter_analyzer.get_user_info, username),
+                asyncio.to_thread(twitter_analyzer.get_user_tweets, username, period)
+            )
             if not user_data:
-                return jsonify({'error': 'User not found or API error'}), 404
+                return json_response({'error': 'User not found or API error'}, 404)
             
-            tweets_data = twitter_analyzer.get_user_tweets(username, period)
             if not tweets_data:
-                return jsonify({'error': 'No tweets found or API error'}), 404
+                return json_response({'error': 'No tweets found or API error'}, 404)
             
-            # Process data
-            result = data_processor.process_twitter_data(
-                user_data, tweets_data, analysis_types
-            )
+            # Process data in the worker pool
+            result = await process_posts('process_twitter_data', platform, user_data, tweets_data, analysis_types)
+            if 'error' not in result:
+                set_cached_analysis(cache_key, result)
             
         elif platform == 'instagram':
             # Check if we have API access or use demo data
@@ -94,19 +211,19 @@ def analyze():
                 # Get Instagram data
                 user_data = instagram_analyzer.get_user_info()
                 if not user_data:
-                    return jsonify({'error': 'Instagram user not found or API error'}), 404
+                    return json_response({'error': 'Instagram user not found or API error'}, 404)
                 
                 media_data = instagram_analyzer.get_user_media(limit=min(period, 25))
                 if not media_data:
-                    return jsonify({'error': 'No Instagram media found or API error'}), 404
+                    return json_response({'error': 'No Instagram media found or API error'}, 404)
             
-            # Process data
-            result = data_processor.process_instagram_data(
-                user_data, media_data, analysis_types
-            )
+            # Process data in the worker pool
+            result = await process_posts('process_instagram_data', platform, user_data, media_data, analysis_types)
+            if 'error' not in result:
+                set_cached_analysis(cache_key, result)
         
         else:
-            return jsonify({'error': 'Unsupported platform'}), 400
+            return json_response({'error': 'Unsupported platform'}, 400)
         
         logger.info(f"Analysis completed for {platform}/@{username}")
         
@@ -116,18 +233,18 @@ def analyze():
                                  analysis_data=result, 
                                  period=period)
         
-        return jsonify(result)
+        return json_response(result)
         
     except Exception as e:
         logger.error(f"Analysis error: {str(e)}")
-        return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
+        return json_response({'error': f'Analysis failed: {str(e)}'}, 500)
 
 @app.route('/dashboard')
 def dashboard():
     """Dashboard page"""
     # For demo purposes, show Instagram demo data
     user_data, media_data = instagram_analyzer.generate_demo_data()
-    result = data_processor.process_instagram_data(
+    result = get_data_processor().process_instagram_data(
         user_data, media_data, ['engagement', 'hashtags', 'timing', 'content']
     )
     return render_template('dashboard.html', analysis_data=result, period=7)
@@ -139,11 +256,11 @@ def export_to_sheets():
         data = request.get_json()
         
         if not data:
-            return jsonify({'error': 'No data provided'}), 400
+            return json_response({'error': 'No data provided'}, 400)
         
         # Google Sheets export implementation would go here
         # For now, return a mock response
-        return jsonify({
+        return json_response({
             'success': True,
             'sheet_url': 'https://docs.google.com/spreadsheets/d/mock-sheet-id',
             'message': 'Google Sheets export is not yet implemented'
@@ -151,12 +268,12 @@ def export_to_sheets():
         
     except Exception as e:
         logger.error(f"Google Sheets export error: {str(e)}")
-        return jsonify({'error': f'Export failed: {str(e)}'}), 500
+        return json_response({'error': f'Export failed: {str(e)}'}, 500)
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return json_response({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
         'version': '1.0.0'
@@ -164,11 +281,11 @@ def health_check():
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({'error': 'Not found'}), 404
+    return json_response({'error': 'Not found'}, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
+    return json_response({'error': 'Internal server error'}, 500)
 
 if __name__ == '__main__':
     # Check for required environment variables
@@ -1,12 +1,103 @@
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import re
-from collections import Counter
+import csv
+import heapq
+from itertools import chain, repeat
+from operator import itemgetter
 import logging
+import warnings
+
+# Shared with the pandas-free fallback processor
+from data_processor_simple import _EMPTY_TEMPLATE, _iso_now
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional; daily engagement falls back to pandas groupby
+    njit = None
+
+try:
+    import pyarrow  # noqa: F401
+    _TEXT_DTYPE = 'string[pyarrow]'
+except ImportError:
+    # Fall back to plain object strings without pyarrow
+    _TEXT_DTYPE = object
 
 logger = logging.getLogger(__name__)
 
+# Patterns shared by the hashtag and content analyzers
+_HASHTAG_RE = re.compile(r'#(\w+)')
+_STRIP_RE = re.compile(r'http\S+|www\S+|@\w+|#\w+')  # URLs, mentions and hashtags
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+
+# Common English stop words excluded from word frequency
+_STOP_WORDS = frozenset({'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had', 'her', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'man', 'new', 'now', 'old', 'see', 'two', 'who', 'boy', 'did', 'its', 'let', 'put', 'say', 'she', 'too', 'use'})
+
+# Below this many posts, pandas groupby is faster than dispatching to the JIT kernel
+_JIT_MIN_ROWS = 1000
+
+if njit:
+    @njit(cache=True)
+    def _daily_sums(days, engagement):
+        """Sorted-group scan over int64 day ordinals, returning (unique days, sums, counts)"""
+        order = np.argsort(days, kind='mergesort')
+        days = days[order]
+        engagement = engagement[order]
+        
+        n_groups = 1
+        for i in range(1, days.shape[0]):
+            if days[i] != days[i - 1]:
+                n_groups += 1
+        
+        unique_days = np.empty(n_groups, dtype=np.int64)
+        sums = np.zeros(n_groups, dtype=np.int64)
+        counts = np.zeros(n_groups, dtype=np.int64)
+        
+        group = 0
+        unique_days[0] = days[0]
+        for i in range(days.shape[0]):
+            if i > 0 and days[i] != days[i - 1]:
+                group += 1
+                unique_days[group] = days[i]
+            sums[group] += engagement[i]
+            counts[group] += 1
+        
+        return unique_days, sums, counts
+else:
+    _daily_sums = None
+
+def _parse_timestamps(values):
+    """Parse ISO 8601 timestamps, keeping their UTC offset (and so the posts' wall-clock hours and dates)"""
+    try:
+        with warnings.catch_warnings():
+            # pandas 2.x warns (3.x raises) on mixed offsets, which are handled below
+            warnings.simplefilter('ignore', FutureWarning)
+            parsed = pd.to_datetime(values, format='ISO8601', cache=True)
+    except ValueError:
+        parsed = None
+    
+    if parsed is None or parsed.dtype == object:
+        # Mixed offsets share no wall clock, so compare them in UTC
+        parsed = pd.to_datetime(values, format='ISO8601', utc=True, cache=True)
+    return parsed
+
 class DataProcessor:
+    # (analysis type, analyzer method, result key) in output order
+    _TWITTER_ANALYZERS = (
+        ('engagement', '_analyze_engagement', 'engagement_data'),
+        ('hashtags', '_analyze_hashtags', 'hashtag_data'),
+        ('timing', '_analyze_timing', 'timing_data'),
+        ('content', '_analyze_content', 'content_data')
+    )
+    _INSTAGRAM_ANALYZERS = (
+        ('engagement', '_analyze_instagram_engagement', 'engagement_data'),
+        ('hashtags', '_analyze_instagram_hashtags', 'hashtag_data'),
+        ('timing', '_analyze_instagram_timing', 'timing_data'),
+        ('content', '_analyze_instagram_content', 'content_data')
+    )
+    
     def __init__(self):
         """Initialize data processor"""
         pass
@@ -17,9 +108,13 @@ class DataProcessor:
             if not tweets_data:
                 return self._empty_result()
             
-            # Convert to DataFrame for easier processing
+            analysis_types = frozenset(analysis_types)
+            
+            # Convert to DataFrame and flatten everything the analyzers need in one pass
             df = pd.DataFrame(tweets_data)
-            df['created_at'] = pd.to_datetime(df['created_at'])
+            df['created_at'] = _parse_timestamps(df['created_at'])
+            df['text'] = df['text'].astype(_TEXT_DTYPE)
+            df = self._preprocess_tweets(df, analysis_types)
             
             # Basic stats
             stats = self._calculate_basic_stats(user_data, df)
@@ -29,21 +124,13 @@ class DataProcessor:
                 'platform': 'twitter',
                 'username': user_data['username'],
                 'stats': stats,
-                'analysis_timestamp': datetime.now().isoformat()
+                'analysis_timestamp': _iso_now()
             }
             
             # Process each analysis type
-            if 'engagement' in analysis_types:
-                result['engagement_data'] = self._analyze_engagement(df)
-            
-            if 'hashtags' in analysis_types:
-                result['hashtag_data'] = self._analyze_hashtags(df)
-            
-            if 'timing' in analysis_types:
-                result['timing_data'] = self._analyze_timing(df)
-            
-            if 'content' in analysis_types:
-                result['content_data'] = self._analyze_content(df)
+            for analysis_type, method, result_key in self._TWITTER_ANALYZERS:
+                if analysis_type in analysis_types:
+                    result[result_key] = getattr(self, method)(df)
             
             return result
             
@@ -51,15 +138,53 @@ class DataProcessor:
             logger.error(f"Error processing Twitter data: {e}")
             return self._empty_result(error=str(e))
     
+    def _preprocess_tweets(self, df, analysis_types):
+        """Flatten raw tweets into the numeric and text columns read by the analyzers"""
+        pm = pd.DataFrame(df['public_metrics'].tolist(), index=df.index)
+        tweets_df = pd.DataFrame({
+            'created_at': df['created_at'],
+            'like_count': pm['like_count'],
+            'retweet_count': pm['retweet_count'],
+            'reply_count': pm['reply_count']
+        })
+        tweets_df['engagement'] = tweets_df['like_count'] + tweets_df['retweet_count'] + tweets_df['reply_count']
+        
+        if 'timing' in analysis_types:
+            tweets_df['hour'] = df['created_at'].dt.hour
+        
+        # Entity-derived columns are only needed by the hashtag and content analyzers
+        if 'hashtags' in analysis_types or 'content' in analysis_types:
+            # Tweets without any entities come back without the field, so the column may be missing
+            entities = df.get('entities', pd.Series(None, index=df.index, dtype=object))
+            entities = entities.map(lambda e: e if isinstance(e, dict) else {})
+            tweets_df['hashtags'] = entities.map(lambda e: [h['tag'].lower() for h in e.get('hashtags', [])])
+            tweets_df['has_urls'] = entities.map(lambda e: bool(e.get('urls')))
+            tweets_df['has_mentions'] = entities.map(lambda e: bool(e.get('mentions')))
+            if 'attachments' in df:
+                tweets_df['has_media'] = df['attachments'].map(lambda a: isinstance(a, dict) and bool(a.get('media_keys')))
+            else:
+                tweets_df['has_media'] = False
+        
+        if 'content' in analysis_types:
+            # Remove URLs, mentions, and hashtags for word analysis. Lowercasing runs on the
+            # Arrow kernel; the regexes stay on Python's re for its Unicode \w/\s semantics.
+            tweets_df['clean_text'] = df['text'].str.lower().astype(object).str.replace(_STRIP_RE, '', regex=True)
+        
+        return tweets_df
+    
     def process_instagram_data(self, user_data, media_data, analysis_types):
         """Process Instagram data and return analysis results"""
         try:
             if not media_data:
                 return self._empty_result()
             
+            analysis_types = frozenset(analysis_types)
+            
             # Convert to DataFrame for easier processing
             df = pd.DataFrame(media_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df['timestamp'] = _parse_timestamps(df['timestamp'])
+            df['caption'] = df['caption'].astype(_TEXT_DTYPE)
+            df['engagement'] = df['like_count'] + df['comments_count']
             
             # Basic stats for Instagram
             stats = self._calculate_instagram_stats(user_data, df)
@@ -69,21 +194,13 @@ class DataProcessor:
                 'platform': 'instagram',
                 'username': user_data['username'],
                 'stats': stats,
-                'analysis_timestamp': datetime.now().isoformat()
+                'analysis_timestamp': _iso_now()
             }
             
             # Process each analysis type for Instagram
-            if 'engagement' in analysis_types:
-                result['engagement_data'] = self._analyze_instagram_engagement(df)
-            
-            if 'hashtags' in analysis_types:
-                result['hashtag_data'] = self._analyze_instagram_hashtags(df)
-            
-            if 'timing' in analysis_types:
-                result['timing_data'] = self._analyze_instagram_timing(df)
-            
-            if 'content' in analysis_types:
-                result['content_data'] = self._analyze_instagram_content(df)
+            for analysis_type, method, result_key in self._INSTAGRAM_ANALYZERS:
+                if analysis_type in analysis_types:
+                    result[result_key] = getattr(self, method)(df)
             
             return result
             
@@ -94,13 +211,15 @@ class DataProcessor:
     def _calculate_basic_stats(self, user_data, df):
         """Calculate basic statistics"""
         try:
+            totals = df[['like_count', 'retweet_count', 'reply_count']].sum()
+
             stats = {
                 'total_posts': len(df),
                 'follower_count': user_data['public_metrics']['followers_count'],
                 'following_count': user_data['public_metrics']['following_count'],
-                'total_likes': df['public_metrics'].apply(lambda x: x['like_count']).sum(),
-                'total_retweets': df['public_metrics'].apply(lambda x: x['retweet_count']).sum(),
-                'total_replies': df['public_metrics'].apply(lambda x: x['reply_count']).sum(),
+                'total_likes': int(totals['like_count']),
+                'total_retweets': int(totals['retweet_count']),
+                'total_replies': int(totals['reply_count']),
                 'avg_engagement': 0,
                 'total_impressions': 0  # Not available in basic API
             }
@@ -131,100 +250,68 @@ class DataProcessor:
             if df.empty:
                 return {'labels': [], 'values': []}
             
-            # Group by date and calculate engagement
-            df['date'] = df['created_at'].dt.date
-            daily_engagement = []
-            
-            for date in df['date'].unique():
-                day_tweets = df[df['date'] == date]
-                total_engagement = 0
-                
-                for _, tweet in day_tweets.iterrows():
-                    metrics = tweet['public_metrics']
-                    engagement = metrics['like_count'] + metrics['retweet_count'] + metrics['reply_count']
-                    total_engagement += engagement
-                
-                avg_engagement = total_engagement / len(day_tweets) if len(day_tweets) > 0 else 0
-                daily_engagement.append({
-                    'date': date.strftime('%Y-%m-%d'),
-                    'engagement': avg_engagement
-                })
-            
-            # Sort by date
-            daily_engagement.sort(key=lambda x: x['date'])
+            # Average per-tweet engagement per date
+            labels, values = self._daily_average(df['created_at'], df['engagement'])
             
             return {
-                'labels': [item['date'] for item in daily_engagement],
-                'values': [item['engagement'] for item in daily_engagement]
+                'labels': labels,
+                'values': values
             }
             
         except Exception as e:
             logger.error(f"Error analyzing engagement: {e}")
             return {'labels': [], 'values': []}
     
+    def _daily_average(self, timestamps, engagement):
+        """Average engagement per calendar day, returned as (labels, values) sorted by date"""
+        if _daily_sums is not None and len(timestamps) >= _JIT_MIN_ROWS:
+            if timestamps.dt.tz is not None:
+                timestamps = timestamps.dt.tz_localize(None)
+            days = timestamps.to_numpy(dtype='datetime64[D]').astype(np.int64)
+            unique_days, sums, counts = _daily_sums(days, engagement.to_numpy(dtype=np.int64))
+            
+            labels = np.datetime_as_string(unique_days.astype('datetime64[D]')).tolist()
+            return labels, (sums / counts).tolist()
+        
+        daily = pd.DataFrame({
+            'date': timestamps.dt.date,
+            'engagement': engagement
+        }).groupby('date', sort=True)['engagement'].mean()
+        
+        return [date.strftime('%Y-%m-%d') for date in daily.index], daily.tolist()
+    
     def _analyze_hashtags(self, df):
         """Analyze hashtag usage and performance"""
         try:
             if df.empty:
                 return {'top_hashtags': [], 'hashtag_performance': []}
             
-            all_hashtags = []
-            hashtag_performance = {}
+            # One row per (tweet, hashtag) pair carrying that tweet's engagement
+            pairs = df[['hashtags', 'engagement']].rename(columns={'hashtags': 'tag'}).explode('tag').dropna(subset=['tag'])
             
-            for _, tweet in df.iterrows():
-                # Extract hashtags from entities
-                entities = tweet.get('entities', {})
-                hashtags = entities.get('hashtags', [])
-                
-                tweet_engagement = (
-                    tweet['public_metrics']['like_count'] + 
-                    tweet['public_metrics']['retweet_count'] + 
-                    tweet['public_metrics']['reply_count']
-                )
-                
-                for hashtag in hashtags:
-                    tag = hashtag['tag'].lower()
-                    all_hashtags.append(tag)
-                    
-                    if tag not in hashtag_performance:
-                        hashtag_performance[tag] = {
-                            'count': 0,
-                            'total_engagement': 0,
-                            'avg_engagement': 0
-                        }
-                    
-                    hashtag_performance[tag]['count'] += 1
-                    hashtag_performance[tag]['total_engagement'] += tweet_engagement
-            
-            # Calculate average engagement for each hashtag
-            for tag in hashtag_performance:
-                if hashtag_performance[tag]['count'] > 0:
-                    hashtag_performance[tag]['avg_engagement'] = (
-                        hashtag_performance[tag]['total_engagement'] / 
-                        hashtag_performance[tag]['count']
-                    )
+            # Count and total engagement per hashtag, in first-seen order so the stable
+            # heapq.nlargest top-k below ranks ties like the Counter/sorted() versions did
+            hashtag_performance = pairs.groupby('tag', sort=False)['engagement'].agg(['count', 'sum'])
+            hashtag_performance['avg_engagement'] = hashtag_performance['sum'] / hashtag_performance['count']
             
             # Get top hashtags by frequency
-            hashtag_counts = Counter(all_hashtags)
             top_hashtags = [
-                {'hashtag': f"#{tag}", 'count': count} 
-                for tag, count in hashtag_counts.most_common(10)
+                {'hashtag': f"#{tag}", 'count': int(count)} 
+                for tag, count in heapq.nlargest(10, hashtag_performance['count'].items(), key=itemgetter(1))
             ]
             
             # Get top performing hashtags
-            top_performing = sorted(
-                hashtag_performance.items(),
-                key=lambda x: x[1]['avg_engagement'],
-                reverse=True
-            )[:10]
+            top_performing = heapq.nlargest(10, zip(
+                hashtag_performance.index, hashtag_performance['count'], hashtag_performance['avg_engagement']
+            ), key=itemgetter(2))
             
             performance_data = [
                 {
                     'hashtag': f"#{tag}",
-                    'count': data['count'],
-                    'avg_engagement': round(data['avg_engagement'], 2)
+                    'count': int(count),
+                    'avg_engagement': round(float(avg_engagement), 2)
                 }
-                for tag, data in top_performing
+                for tag, count, avg_engagement in top_performing
             ]
             
             return {
@@ -243,12 +330,11 @@ class DataProcessor:
                 return {'labels': [], 'values': []}
             
             # Analyze posting by hour of day
-            df['hour'] = df['created_at'].dt.hour
-            hourly_counts = df['hour'].value_counts().sort_index()
+            hourly_counts = df['hour'].value_counts().reindex(range(24), fill_value=0)
             
             # Create labels for hours
             hour_labels = [f"{hour:02d}:00" for hour in range(24)]
-            hour_values = [hourly_counts.get(hour, 0) for hour in range(24)]
+            hour_values = hourly_counts.tolist()
             
             return {
                 'labels': hour_labels,
@@ -265,45 +351,28 @@ class DataProcessor:
             if df.empty:
                 return {'word_frequency': [], 'content_types': []}
             
-            # Extract all words from tweets
-            all_words = []
+            words = df['clean_text'].str.findall(_WORD_RE).explode().dropna()
+            
+            # Categorize content type (a tweet counts towards every type it contains)
+            has_media = df['has_media'].to_numpy(dtype=bool)
+            has_urls = df['has_urls'].to_numpy(dtype=bool)
+            has_hashtags = df['hashtags'].str.len().gt(0).to_numpy(dtype=bool)
+            has_mentions = df['has_mentions'].to_numpy(dtype=bool)
             content_types = {
-                'with_media': 0,
-                'with_urls': 0,
-                'with_hashtags': 0,
-                'with_mentions': 0,
-                'text_only': 0
+                'with_media': int(has_media.sum()),
+                'with_urls': int(has_urls.sum()),
+                'with_hashtags': int(has_hashtags.sum()),
+                'with_mentions': int(has_mentions.sum()),
+                'text_only': int((~(has_media | has_urls | has_hashtags | has_mentions)).sum())
             }
             
-            for _, tweet in df.iterrows():
-                text = tweet['text'].lower()
-                
-                # Remove URLs, mentions, and hashtags for word analysis
-                clean_text = re.sub(r'http\S+|www\S+|@\w+|#\w+', '', text)
-                words = re.findall(r'\b[a-zA-Z]{3,}\b', clean_text)
-                all_words.extend(words)
-                
-                # Categorize content type
-                entities = tweet.get('entities', {})
-                
-                if entities.get('urls'):
-                    content_types['with_urls'] += 1
-                elif entities.get('hashtags'):
-                    content_types['with_hashtags'] += 1
-                elif entities.get('mentions'):
-                    content_types['with_mentions'] += 1
-                else:
-                    content_types['text_only'] += 1
-            
-            # Get most common words
-            word_counts = Counter(all_words)
-            # Filter out common stop words
-            stop_words = {'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had', 'her', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'man', 'new', 'now', 'old', 'see', 'two', 'who', 'boy', 'did', 'its', 'let', 'put', 'say', 'she', 'too', 'use'}
-            filtered_words = [(word, count) for word, count in word_counts.most_common(20) if word not in stop_words]
+            # Get most common words, filtering out common stop words first. heapq.nlargest
+            # is a stable top-k, so tied words keep first-seen order like Counter.most_common
+            word_counts = words[~words.isin(_STOP_WORDS)].value_counts(sort=False)
             
             word_frequency = [
-                {'word': word, 'count': count} 
-                for word, count in filtered_words[:10]
+                {'word': word, 'count': int(count)} 
+                for word, count in heapq.nlargest(10, word_counts.items(), key=itemgetter(1))
             ]
             
             content_type_list = [
@@ -322,25 +391,8 @@ class DataProcessor:
     
     def _empty_result(self, error=None):
         """Return empty result structure"""
-        result = {
-            'platform': 'unknown',
-            'username': 'unknown',
-            'stats': {
-                'total_posts': 0,
-                'follower_count': 0,
-                'following_count': 0,
-                'total_likes': 0,
-                'total_retweets': 0,
-                'total_replies': 0,
-                'avg_engagement': 0,
-                'total_impressions': 0
-            },
-            'engagement_data': {'labels': [], 'values': []},
-            'hashtag_data': {'top_hashtags': [], 'hashtag_performance': []},
-            'timing_data': {'labels': [], 'values': []},
-            'content_data': {'word_frequency': [], 'content_types': []},
-            'analysis_timestamp': datetime.now().isoformat()
-        }
+        # Top-level copy of the shared template; nested values are never mutated
+        result = {**_EMPTY_TEMPLATE, 'analysis_timestamp': _iso_now()}
         
         if error:
             result['error'] = error
@@ -350,27 +402,20 @@ class DataProcessor:
     def export_to_csv(self, data, filename):
         """Export analysis data to CSV"""
         try:
-            # Create a comprehensive dataset
-            export_data = []
-            
-            # Add basic stats
-            stats = data.get('stats', {})
-            export_data.append(['統計', '値'])
-            for key, value in stats.items():
-                export_data.append([key, value])
-            
-            # Add engagement data
-            engagement = data.get('engagement_data', {})
-            if engagement.get('labels'):
-                export_data.append(['', ''])  # Empty row
-                export_data.append(['日付', 'エンゲージメント'])
-                for i, label in enumerate(engagement['labels']):
-                    value = engagement['values'][i] if i < len(engagement['values']) else 0
-                    export_data.append([label, value])
-            
-            # Save to CSV
-            df = pd.DataFrame(export_data)
-            df.to_csv(filename, index=False, header=False, encoding='utf-8-sig')
+            with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f, lineterminator='\n')
+                
+                # Add basic stats
+                stats = data.get('stats', {})
+                writer.writerow(['統計', '値'])
+                writer.writerows(stats.items())
+                
+                # Add engagement data (missing values are written as 0)
+                engagement = data.get('engagement_data', {})
+                if engagement.get('labels'):
+                    writer.writerow(['', ''])  # Empty row
+                    writer.writerow(['日付', 'エンゲージメント'])
+                    writer.writerows(zip(engagement['labels'], chain(engagement.get('values', []), repeat(0))))
             
             return True
             
@@ -420,30 +465,12 @@ class DataProcessor:
             if df.empty:
                 return {'labels': [], 'values': []}
             
-            # Group by date and calculate engagement
-            df['date'] = df['timestamp'].dt.date
-            daily_engagement = []
-            
-            for date in df['date'].unique():
-                day_posts = df[df['date'] == date]
-                total_engagement = 0
-                
-                for _, post in day_posts.iterrows():
-                    engagement = post['like_count'] + post['comments_count']
-                    total_engagement += engagement
-                
-                avg_engagement = total_engagement / len(day_posts) if len(day_posts) > 0 else 0
-                daily_engagement.append({
-                    'date': date.strftime('%Y-%m-%d'),
-                    'engagement': avg_engagement
-                })
-            
-            # Sort by date
-            daily_engagement.sort(key=lambda x: x['date'])
+            # Average per-post engagement per date
+            labels, values = self._daily_average(df['timestamp'], df['engagement'])
             
             return {
-                'labels': [item['date'] for item in daily_engagement],
-                'values': [item['engagement'] for item in daily_engagement]
+                'labels': labels,
+                'values': values
             }
             
         except Exception as e:
@@ -456,60 +483,35 @@ class DataProcessor:
             if df.empty:
                 return {'top_hashtags': [], 'hashtag_performance': []}
             
-            all_hashtags = []
-            hashtag_performance = {}
+            # One row per (post, hashtag) pair carrying that post's engagement
+            pairs = pd.DataFrame({
+                'tag': df['caption'].fillna('').str.lower().astype(object).str.findall(_HASHTAG_RE),
+                'engagement': df['engagement']
+            }).explode('tag').dropna(subset=['tag'])
             
-            for _, post in df.iterrows():
-                caption = post.get('caption', '')
-                if not caption:
-                    continue
-                
-                # Extract hashtags from caption
-                hashtags = re.findall(r'#(\w+)', caption.lower())
-                post_engagement = post['like_count'] + post['comments_count']
-                
-                for hashtag in hashtags:
-                    all_hashtags.append(hashtag)
-                    
-                    if hashtag not in hashtag_performance:
-                        hashtag_performance[hashtag] = {
-                            'count': 0,
-                            'total_engagement': 0,
-                            'avg_engagement': 0
-                        }
-                    
-                    hashtag_performance[hashtag]['count'] += 1
-                    hashtag_performance[hashtag]['total_engagement'] += post_engagement
-            
-            # Calculate average engagement for each hashtag
-            for tag in hashtag_performance:
-                if hashtag_performance[tag]['count'] > 0:
-                    hashtag_performance[tag]['avg_engagement'] = (
-                        hashtag_performance[tag]['total_engagement'] / 
-                        hashtag_performance[tag]['count']
-                    )
+            # Count and total engagement per hashtag, in first-seen order so the stable
+            # heapq.nlargest top-k below ranks ties like the Counter/sorted() versions did
+            hashtag_performance = pairs.groupby('tag', sort=False)['engagement'].agg(['count', 'sum'])
+            hashtag_performance['avg_engagement'] = hashtag_performance['sum'] / hashtag_performance['count']
             
             # Get top hashtags by frequency
-            hashtag_counts = Counter(all_hashtags)
             top_hashtags = [
-                {'hashtag': f"#{tag}", 'count': count} 
-                for tag, count in hashtag_counts.most_common(10)
+                {'hashtag': f"#{tag}", 'count': int(count)} 
+                for tag, count in heapq.nlargest(10, hashtag_performance['count'].items(), key=itemgetter(1))
             ]
             
             # Get top performing hashtags
-            top_performing = sorted(
-                hashtag_performance.items(),
-                key=lambda x: x[1]['avg_engagement'],
-                reverse=True
-            )[:10]
+            top_performing = heapq.nlargest(10, zip(
+                hashtag_performance.index, hashtag_performance['count'], hashtag_performance['avg_engagement']
+            ), key=itemgetter(2))
             
             performance_data = [
                 {
                     'hashtag': f"#{tag}",
-                    'count': data['count'],
-                    'avg_engagement': round(data['avg_engagement'], 2)
+                    'count': int(count),
+                    'avg_engagement': round(float(avg_engagement), 2)
                 }
-                for tag, data in top_performing
+                for tag, count, avg_engagement in top_performing
             ]
             
             return {
@@ -528,12 +530,11 @@ class DataProcessor:
                 return {'labels': [], 'values': []}
             
             # Analyze posting by hour of day
-            df['hour'] = df['timestamp'].dt.hour
-            hourly_counts = df['hour'].value_counts().sort_index()
+            hourly_counts = df['timestamp'].dt.hour.value_counts().reindex(range(24), fill_value=0)
             
             # Create labels for hours
             hour_labels = [f"{hour:02d}:00" for hour in range(24)]
-            hour_values = [hourly_counts.get(hour, 0) for hour in range(24)]
+            hour_values = hourly_counts.tolist()
             
             return {
                 'labels': hour_labels,
@@ -557,25 +558,17 @@ class DataProcessor:
                 for media_type, count in content_types.items()
             ]
             
-            # Extract words from captions
-            all_words = []
-            for _, post in df.iterrows():
-                caption = post.get('caption', '')
-                if caption:
-                    # Remove hashtags, mentions, and URLs for word analysis
-                    clean_text = re.sub(r'#\w+|@\w+|http\S+|www\S+', '', caption.lower())
-                    words = re.findall(r'\b[a-zA-Z]{3,}\b', clean_text)
-                    all_words.extend(words)
-            
-            # Get most common words
-            word_counts = Counter(all_words)
-            # Filter out common stop words
-            stop_words = {'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had', 'her', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'man', 'new', 'now', 'old', 'see', 'two', 'who', 'boy', 'did', 'its', 'let', 'put', 'say', 'she', 'too', 'use'}
-            filtered_words = [(word, count) for word, count in word_counts.most_common(20) if word not in stop_words]
+            # Extract words from captions, removing hashtags, mentions, and URLs
+            clean_text = df['caption'].fillna('').str.lower().astype(object).str.replace(_STRIP_RE, '', regex=True)
+            words = clean_text.str.findall(_WORD_RE).explode().dropna()
+            
+            # Get most common words, filtering out common stop words first. heapq.nlargest
+            # is a stable top-k, so tied words keep first-seen order like Counter.most_common
+            word_counts = words[~words.isin(_STOP_WORDS)].value_counts(sort=False)
             
             word_frequency = [
-                {'word': word, 'count': count} 
-                for word, count in filtered_words[:10]
+                {'word': word, 'count': int(count)} 
+                for word, count in heapq.nlargest(10, word_counts.items(), key=itemgetter(1))
             ]
             
             return {
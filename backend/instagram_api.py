@@ -1,10 +1,28 @@
 import requests
+import orjson
 import os
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Fields returned by get_user_media and their defaults when the API omits them
+_MEDIA_FIELD_DEFAULTS = (
+    ('id', None),
+    ('media_type', None),
+    ('media_url', None),
+    ('thumbnail_url', None),
+    ('permalink', None),
+    ('caption', ''),
+    ('timestamp', None),
+    ('like_count', 0),
+    ('comments_count', 0)
+)
+
 class InstagramAnalyzer:
     def __init__(self):
         """Initialize Instagram Basic Display API client"""
@@ -13,6 +31,20 @@ class InstagramAnalyzer:
         self.app_secret = os.getenv('INSTAGRAM_APP_SECRET')
         self.base_url = 'https://graph.instagram.com'
         
+        # Reuse connections to graph.instagram.com across calls and retry transient
+        # errors; unlike tweepy there is no rate limit handling, so 429 is retried too
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False
+            )
+        ))
+        
         if not self.access_token:
             logger.warning("Instagram Access Token not found in environment variables")
     
@@ -29,10 +61,10 @@ class InstagramAnalyzer:
                 'access_token': self.access_token
             }
             
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params)
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 return {
                     'id': data.get('id'),
                     'username': data.get('username'),
@@ -48,7 +80,7 @@ class InstagramAnalyzer:
             return None
     
     def get_user_media(self, limit=25):
-        """Get user's recent media posts"""
+        """Get user's recent media posts, following pagination past the 25-per-page API limit"""
         if not self.access_token:
             logger.error("Instagram access token not configured")
             return None
@@ -57,35 +89,37 @@ class InstagramAnalyzer:
             url = f"{self.base_url}/me/media"
             params = {
                 'fields': 'id,media_type,media_url,thumbnail_url,permalink,caption,timestamp,like_count,comments_count',
-                'limit': min(limit, 25),  # API limit
+                'limit': min(limit, 25),  # API limit per page
                 'access_token': self.access_token
             }
+            media_list = []
             
-            response = requests.get(url, params=params)
-            
-            if response.status_code == 200:
-                data = response.json()
-                media_list = []
+            # Each page's cursor comes from the previous one, so pages are fetched in order
+            while url and len(media_list) < limit:
+                response = self.session.get(url, params=params)
                 
-                for media in data.get('data', []):
-                    media_data = {
-                        'id': media.get('id'),
-                        'media_type': media.get('media_type'),
-                        'media_url': media.get('media_url'),
-                        'thumbnail_url': media.get('thumbnail_url'),
-                        'permalink': media.get('permalink'),
-                        'caption': media.get('caption', ''),
-                        'timestamp': media.get('timestamp'),
-                        'like_count': media.get('like_count', 0),
-                        'comments_count': media.get('comments_count', 0)
-                    }
-                    media_list.append(media_data)
+                if response.status_code != 200:
+                    logger.error(f"Instagram API error: {response.status_code} - {response.text}")
+                    if not media_list:
+                        return None
+                    break  # Keep the pages already retrieved
                 
-                logger.info(f"Retrieved {len(media_list)} Instagram media posts")
-                return media_list
-            else:
-                logger.error(f"Instagram API error: {response.status_code} - {response.text}")
-                return None
+                data = orjson.loads(response.content)
+                page = data.get('data', [])
+                
+                # Fill missing fields in place instead of copying each post
+                for media in page:
+                    for field, default in _MEDIA_FIELD_DEFAULTS:
+                        media.setdefault(field, default)
+                media_list.extend(page)
+                
+                # The next URL already carries fields, limit, token and cursor
+                url = data.get('paging', {}).get('next')
+                params = None
+            
+            del media_list[limit:]
+            logger.info(f"Retrieved {len(media_list)} Instagram media posts")
+            return media_list
                 
         except Exception as e:
             logger.error(f"Error getting Instagram media: {e}")
@@ -104,10 +138,10 @@ class InstagramAnalyzer:
                 'access_token': self.access_token
             }
             
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params)
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 insights = {}
                 
                 for insight in data.get('data', []):
@@ -125,12 +159,29 @@ class InstagramAnalyzer:
             logger.error(f"Error getting Instagram insights: {e}")
             return None
     
+    def get_insights_bulk(self, media_ids, max_workers=8):
+        """Get insights for several media posts concurrently, keyed by media id"""
+        media_ids = list(media_ids)
+        if not media_ids:
+            return {}
+        
+        # Requests are I/O bound; max_workers matches the session pool size
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(media_ids))) as executor:
+            return dict(zip(media_ids, executor.map(self.get_media_insights, media_ids)))
+    
     def generate_demo_data(self):
         """Generate demo data for testing without API access"""
+        # The data is seeded, so it only changes when the date does; callers must not mutate it
+        return self._build_demo_data(date.today())
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _build_demo_data(day):
+        """Build the seeded demo user and recent posts ending at the start of day"""
         import random
-        from datetime import datetime, timedelta
         
         logger.info("Generating Instagram demo data")
+        rng = random.Random(42)
         
         # Demo user info
         user_info = {
@@ -156,21 +207,21 @@ class InstagramAnalyzer:
         ]
         
         media_list = []
-        base_date = datetime.now()
+        base_date = datetime.combine(day, datetime.min.time())
         
         for i in range(20):
-            post_date = base_date - timedelta(days=i, hours=random.randint(0, 23))
+            post_date = base_date - timedelta(days=i, hours=rng.randint(0, 23))
             
             media_data = {
                 'id': f'demo_media_{i}',
-                'media_type': random.choice(media_types),
+                'media_type': rng.choice(media_types),
                 'media_url': f'https://example.com/demo_image_{i}.jpg',
                 'thumbnail_url': f'https://example.com/demo_thumb_{i}.jpg',
                 'permalink': f'https://instagram.com/p/demo_{i}',
-                'caption': random.choice(demo_captions),
+                'caption': rng.choice(demo_captions),
                 'timestamp': post_date.isoformat(),
-                'like_count': random.randint(10, 500),
-                'comments_count': random.randint(0, 50)
+                'like_count': rng.randint(10, 500),
+                'comments_count': rng.randint(0, 50)
             }
             media_list.append(media_data)
         
@@ -188,10 +239,10 @@ class InstagramAnalyzer:
                 'access_token': self.access_token
             }
             
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params)
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 new_token = data.get('access_token')
                 expires_in = data.get('expires_in')
                 
@@ -1,10 +1,166 @@
 import tweepy
+import asyncio
+import heapq
+import orjson
 import os
-from datetime import datetime, timedelta
+import re
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache, wraps
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, timedelta, timezone
 import logging
 
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
 logger = logging.getLogger(__name__)
 
+# Username -> user id lookups are reused for this long (seconds)
+USER_ID_CACHE_TTL = 3600
+USER_ID_CACHE_MAXSIZE = 4096
+
+# A user's fetched tweets are topped up with since_id for this long (seconds) before a
+# full refetch, which bounds how stale the metrics of already-seen tweets can get
+TWEET_STORE_TTL = 300
+TWEET_STORE_MAXSIZE = 256
+
+# Tweet fields requested by default: only what the analyzers and hashtag analytics read.
+# context_annotations is large and unused, so it is only requested with include_rich=True
+USER_TWEET_FIELDS = ['created_at', 'public_metrics', 'entities', 'attachments']
+SEARCH_TWEET_FIELDS = ['created_at', 'public_metrics', 'author_id']
+RICH_TWEET_FIELDS = ['context_annotations']
+
+# Maximum usernames per GET /2/users/by request
+USERS_LOOKUP_BATCH_SIZE = 100
+
+# HTTP response cache for Twitter GETs (used when requests-cache is installed), seconds
+RESPONSE_CACHE_EXPIRE_AFTER = 60
+RESPONSE_CACHE_URLS_EXPIRE_AFTER = {
+    # Prefix match: covers batched /2/users/by?usernames= and /2/users/by/username/<name>
+    'api.twitter.com/2/users/by': 600,
+    'api.twitter.com/2/tweets/search/recent': 60
+}
+
+# Client-side request budget per endpoint: (path pattern, requests, window seconds), matching
+# the API's documented app-only limits so calls fail fast instead of hitting a 429
+RATE_LIMITS = {
+    'get_user': (r'/2/users/by/username/[^/]+', 300, 900),
+    'get_users': (r'/2/users/by', 300, 900),
+    'get_users_tweets': (r'/2/users/[^/]+/tweets', 1500, 900),
+    'search_recent_tweets': (r'/2/tweets/search/recent', 450, 900)
+}
+
+class RateLimitExceeded(Exception):
+    """Raised when a call would exceed the client-side request budget"""
+
+class TokenBucket:
+    """Thread-safe token bucket allowing capacity calls per period seconds"""
+    
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def try_acquire(self):
+        """Take one token if available, without waiting"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter charging each request sent over the network to its endpoint's budget.
+    
+    requests-cache answers cache hits before the adapter is reached, so they are free.
+    """
+    
+    def __init__(self, limits, **kwargs):
+        self.buckets = [
+            (name, re.compile(pattern), TokenBucket(calls, period))
+            for name, (pattern, calls, period) in limits.items()
+        ]
+        super().__init__(**kwargs)
+    
+    def send(self, request, **kwargs):
+        path = urlsplit(request.url).path
+        for name, pattern, bucket in self.buckets:
+            if pattern.fullmatch(path):
+                if not bucket.try_acquire():
+                    raise RateLimitExceeded(f"Twitter API request budget exhausted for {name}")
+                break
+        return super().send(request, **kwargs)
+
+def _naive_utc(moment):
+    """Return moment as a naive UTC datetime (naive input is taken to be UTC already)"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+def window_start(days):
+    """UTC start of the last days-long window, rounded up to the next minute"""
+    # Rounding up keeps a 7-day start_time inside the recent search limit
+    return _window_start(days, int(-(-time.time() // 60)))
+
+@lru_cache(maxsize=8)
+def _window_start(days, minute):
+    # Calls within the same minute share one start_time, so request URLs (and the
+    # HTTP response cache keys) stay identical instead of changing every microsecond
+    return _naive_utc(datetime.fromtimestamp(minute * 60, timezone.utc)) - timedelta(days=days)
+
+def coalesce(method):
+    """Make concurrent calls of a TwitterAnalyzer method with equal arguments share one API call"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        
+        # Callers arrive from threads of different event loops, so wait on a thread-safe future
+        if not leader:
+            return future.result()
+        
+        try:
+            result = method(self, *args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+    return wrapper
+
+def _orjson_response_hook(response, *args, **kwargs):
+    """requests response hook making response.json() decode with orjson"""
+    requests_json = response.json
+    
+    def json(**kwargs):
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            # tweepy catches requests.JSONDecodeError for non-JSON error bodies
+            return requests_json(**kwargs)
+    
+    response.json = json
+    return response
+
 class TwitterAnalyzer:
     def __init__(self):
         """Initialize Twitter API client"""
@@ -14,6 +170,18 @@ class TwitterAnalyzer:
         self.access_token = os.getenv('TWITTER_ACCESS_TOKEN')
         self.access_token_secret = os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
         
+        # Lowercased username -> (expires_at, user id)
+        self._user_ids = {}
+        self._user_ids_lock = threading.Lock()
+        
+        # User id -> (expires_at, start_time, max_results, tweets newest first)
+        self._tweet_store = {}
+        self._tweet_store_lock = threading.Lock()
+        
+        # Calls in progress for coalesce: (method, args, kwargs) -> Future
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        
         # Initialize Tweepy client
         self.client = None
         if self.bearer_token:
@@ -24,8 +192,39 @@ class TwitterAnalyzer:
                     consumer_secret=self.api_secret,
                     access_token=self.access_token,
                     access_token_secret=self.access_token_secret,
-                    wait_on_rate_limit=True
+                    wait_on_rate_limit=False  # Budgets are enforced by RateLimitedAdapter below
                 )
+                
+                # Serve repeated GETs from a local SQLite cache when requests-cache is available.
+                # Twitter marks responses no-store, so Cache-Control headers are not honoured.
+                if requests_cache:
+                    self.client.session = requests_cache.CachedSession(
+                        'twitter_cache',
+                        backend='sqlite',
+                        expire_after=RESPONSE_CACHE_EXPIRE_AFTER,
+                        urls_expire_after=RESPONSE_CACHE_URLS_EXPIRE_AFTER,
+                        allowable_methods=('GET',)
+                    )
+                
+                # Keep connections to the API host alive across calls (sized for the threaded
+                # fan-out helpers) and retry transient server errors.
+                # 429s are not retried: callers get tweepy.TooManyRequests right away.
+                # Request budgets are tracked locally, failing fast rather than sleeping up to 15 minutes.
+                adapter = RateLimitedAdapter(
+                    RATE_LIMITS,
+                    pool_connections=1,
+                    pool_maxsize=32,
+                    max_retries=Retry(
+                        total=3,
+                        backoff_factor=0.3,
+                        status_forcelist=[500, 502, 503, 504],
+                        raise_on_status=False
+                    )
+                )
+                self.client.session.mount('https://api.twitter.com', adapter)
+                
+                # tweepy parses every response with response.json(); decode with orjson instead
+                self.client.session.hooks['response'].append(_orjson_response_hook)
                 logger.info("Twitter API client initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize Twitter API client: {e}")
@@ -34,45 +233,105 @@ class TwitterAnalyzer:
     
     def get_user_info(self, username):
         """Get user information"""
+        return self._lookup_user(username.lstrip('@').lower())
+    
+    @coalesce
+    def _lookup_user(self, username):
+        """Look up one normalized username; concurrent lookups (e.g. from get_user_tweets) share a request"""
+        users = self.get_users_info([username])
+        return users[username] if users else None
+    
+    def get_users_info(self, usernames):
+        """Get user information for several usernames, 100 per request, keyed by the given username"""
         if not self.client:
             logger.error("Twitter API client not initialized")
             return None
         
         try:
-            # Remove @ symbol if present
-            username = username.lstrip('@')
+            usernames = list(usernames)
+            # Remove @ symbol if present; lookups are case-insensitive
+            wanted = list(dict.fromkeys(username.lstrip('@').lower() for username in usernames))
+            found = {}
             
-            user = self.client.get_user(
-                username=username,
-                user_fields=['public_metrics', 'created_at', 'description', 'verified']
-            )
+            for start in range(0, len(wanted), USERS_LOOKUP_BATCH_SIZE):
+                response = self.client.get_users(
+                    usernames=wanted[start:start + USERS_LOOKUP_BATCH_SIZE],
+                    user_fields=['public_metrics', 'created_at', 'description', 'verified']
+                )
+                
+                # Unknown usernames are reported in response.errors and left out of data
+                for user in response.data or []:
+                    self._remember_user_id(user.username, user.id)
+                    found[user.username.lower()] = {
+                        'id': user.id,
+                        'username': user.username,
+                        'name': user.name,
+                        'description': user.description,
+                        'verified': user.verified,
+                        'created_at': user.created_at,
+                        'public_metrics': user.public_metrics
+                    }
             
-            if user.data:
-                return {
-                    'id': user.data.id,
-                    'username': user.data.username,
-                    'name': user.data.name,
-                    'description': user.data.description,
-                    'verified': user.data.verified,
-                    'created_at': user.data.created_at,
-                    'public_metrics': user.data.public_metrics
-                }
-            else:
-                logger.error(f"User @{username} not found")
-                return None
+            users = {}
+            for username in usernames:
+                users[username] = found.get(username.lstrip('@').lower())
+                if users[username] is None:
+                    logger.error(f"User @{username.lstrip('@')} not found")
+            return users
                 
         except tweepy.Unauthorized:
             logger.error("Twitter API: Unauthorized access")
             return None
-        except tweepy.NotFound:
-            logger.error(f"User @{username} not found")
+        except (tweepy.TooManyRequests, RateLimitExceeded):
+            logger.error("Twitter API: Rate limit exceeded")
             return None
         except Exception as e:
             logger.error(f"Error getting user info: {e}")
             return None
     
-    def get_user_tweets(self, username, days=30, max_results=100):
-        """Get user's recent tweets"""
+    def _remember_user_id(self, username, user_id):
+        """Cache the id of username for USER_ID_CACHE_TTL seconds"""
+        key = username.lower()
+        with self._user_ids_lock:
+            if key not in self._user_ids and len(self._user_ids) >= USER_ID_CACHE_MAXSIZE:
+                self._user_ids.pop(next(iter(self._user_ids)))
+            self._user_ids[key] = (time.monotonic() + USER_ID_CACHE_TTL, user_id)
+    
+    def _resolve_user_id(self, username):
+        """Return the user id for username, calling the API only on a cache miss"""
+        key = username.lower()
+        with self._user_ids_lock:
+            entry = self._user_ids.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        
+        # On a cold cache this joins a concurrent get_user_info call for the same user
+        # instead of sending a second lookup; get_users_info remembers the id
+        user = self._lookup_user(key)
+        return user['id'] if user else None
+    
+    async def get_many_user_infos(self, usernames, concurrency=5):
+        """Get user information for several usernames concurrently, keyed by username"""
+        # tweepy's AsyncClient ties its aiohttp session to one event loop, while Flask runs
+        # each async view in a new loop, so the pooled blocking client runs in threads instead
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch(batch):
+            async with semaphore:
+                return await asyncio.to_thread(self.get_users_info, batch)
+        
+        usernames = list(usernames)
+        batches = [usernames[start:start + USERS_LOOKUP_BATCH_SIZE]
+                   for start in range(0, len(usernames), USERS_LOOKUP_BATCH_SIZE)]
+        
+        users = {}
+        for batch, result in zip(batches, await asyncio.gather(*(fetch(batch) for batch in batches))):
+            users.update(result or dict.fromkeys(batch))
+        return users
+    
+    @coalesce
+    def get_user_tweets(self, username, days=30, max_results=100, since_id=None, include_rich=False, start_time=None):
+        """Get user's recent tweets (only those newer than since_id when given)"""
         if not self.client:
             logger.error("Twitter API client not initialized")
             return None
@@ -81,39 +340,25 @@ class TwitterAnalyzer:
             # Remove @ symbol if present
             username = username.lstrip('@')
             
-            # Get user ID first
-            user = self.client.get_user(username=username)
-            if not user.data:
+            # Get user ID first (cached after the first lookup)
+            user_id = self._resolve_user_id(username)
+            if user_id is None:
                 logger.error(f"User @{username} not found")
                 return None
             
-            user_id = user.data.id
-            
-            # Calculate start time
-            start_time = datetime.utcnow() - timedelta(days=days)
+            # Calculate start time (caller-supplied times may be aware; use naive UTC throughout)
+            if start_time is None:
+                start_time = window_start(days)
+            else:
+                start_time = _naive_utc(start_time)
             
             # Get tweets
-            tweets = self.client.get_users_tweets(
-                id=user_id,
-                start_time=start_time,
-                max_results=min(max_results, 100),  # API limit
-                tweet_fields=['created_at', 'public_metrics', 'context_annotations', 'entities'],
-                exclude=['retweets', 'replies']  # Focus on original tweets
-            )
+            if since_id is None and not include_rich:
+                tweet_list = self._get_window_tweets(user_id, start_time, max_results)
+            else:
+                tweet_list = list(self.iter_user_tweets(user_id, start_time, max_results, since_id, include_rich))
             
-            if tweets.data:
-                tweet_list = []
-                for tweet in tweets.data:
-                    tweet_data = {
-                        'id': tweet.id,
-                        'text': tweet.text,
-                        'created_at': tweet.created_at,
-                        'public_metrics': tweet.public_metrics,
-                        'entities': getattr(tweet, 'entities', {}),
-                        'context_annotations': getattr(tweet, 'context_annotations', [])
-                    }
-                    tweet_list.append(tweet_data)
-                
+            if tweet_list:
                 logger.info(f"Retrieved {len(tweet_list)} tweets for @{username}")
                 return tweet_list
             else:
@@ -123,62 +368,132 @@ class TwitterAnalyzer:
         except tweepy.Unauthorized:
             logger.error("Twitter API: Unauthorized access")
             return None
-        except tweepy.TooManyRequests:
+        except (tweepy.TooManyRequests, RateLimitExceeded):
             logger.error("Twitter API: Rate limit exceeded")
             return None
         except Exception as e:
             logger.error(f"Error getting user tweets: {e}")
             return None
     
-    def search_tweets(self, query, days=7, max_results=100):
+    def _get_window_tweets(self, user_id, start_time, max_results):
+        """Return the newest max_results tweets since start_time, fetching only new tweets while the stored ones are fresh"""
+        # start_time is naive UTC (normalized by get_user_tweets), like the stored start times
+        with self._tweet_store_lock:
+            entry = self._tweet_store.get(user_id)
+        
+        # A stored fetch covering an equal or wider window serves this one after a since_id top-up
+        covered = entry and entry[0] > time.monotonic() and entry[1] <= start_time and entry[2] >= max_results
+        
+        if covered:
+            expires_at, stored_start, stored_max, stored = entry
+            newest_id = stored[0]['id'] if stored else None
+            new_tweets = list(self.iter_user_tweets(user_id, stored_start, stored_max, since_id=newest_id))
+            tweets = (new_tweets + stored)[:stored_max]
+            self._store_tweets(user_id, (expires_at, stored_start, stored_max, tweets))
+            
+            cutoff = start_time.replace(tzinfo=timezone.utc)
+            return [tweet for tweet in tweets if tweet['created_at'] >= cutoff][:max_results]
+        
+        tweets = list(self.iter_user_tweets(user_id, start_time, max_results))
+        self._store_tweets(user_id, (time.monotonic() + TWEET_STORE_TTL, start_time, max_results, tweets))
+        return tweets
+    
+    def _store_tweets(self, user_id, entry):
+        """Remember the fetched tweets of user_id for incremental fetches"""
+        with self._tweet_store_lock:
+            if user_id not in self._tweet_store and len(self._tweet_store) >= TWEET_STORE_MAXSIZE:
+                self._tweet_store.pop(next(iter(self._tweet_store)))
+            self._tweet_store[user_id] = entry
+    
+    def iter_user_tweets(self, user_id, start_time, max_results=100, since_id=None, include_rich=False):
+        """Yield a user's original tweets since start_time, following pagination up to max_results (API errors propagate)"""
+        paginator = tweepy.Paginator(
+            self.client.get_users_tweets,
+            id=user_id,
+            start_time=start_time,
+            since_id=since_id,
+            max_results=min(max_results, 100),  # API limit per page
+            tweet_fields=USER_TWEET_FIELDS + RICH_TWEET_FIELDS if include_rich else USER_TWEET_FIELDS,
+            exclude=['retweets', 'replies']  # Focus on original tweets
+        )
+        
+        for tweet in paginator.flatten(limit=max_results):
+            yield {
+                'id': tweet.id,
+                'text': tweet.text,
+                'created_at': tweet.created_at,
+                'public_metrics': tweet.public_metrics,
+                'entities': getattr(tweet, 'entities', {}),
+                'attachments': getattr(tweet, 'attachments', None),
+                'context_annotations': getattr(tweet, 'context_annotations', [])
+            }
+    
+    @coalesce
+    def search_tweets(self, query, days=7, max_results=100, include_rich=False, start_time=None):
         """Search for tweets with a specific query"""
         if not self.client:
             logger.error("Twitter API client not initialized")
             return None
         
         try:
-            # Calculate start time
-            start_time = datetime.utcnow() - timedelta(days=days)
+            # Calculate start time (caller-supplied times may be aware; use naive UTC throughout)
+            if start_time is None:
+                start_time = window_start(days)
+            else:
+                start_time = _naive_utc(start_time)
             
             # Search tweets
-            tweets = self.client.search_recent_tweets(
-                query=query,
-                start_time=start_time,
-                max_results=min(max_results, 100),
-                tweet_fields=['created_at', 'public_metrics', 'author_id', 'context_annotations'],
-                expansions=['author_id']
-            )
+            tweet_list = list(self.iter_search_tweets(query, start_time, max_results, include_rich))
             
-            if tweets.data:
-                tweet_list = []
-                users = {user.id: user for user in tweets.includes.get('users', [])}
-                
-                for tweet in tweets.data:
-                    author = users.get(tweet.author_id, {})
-                    tweet_data = {
-                        'id': tweet.id,
-                        'text': tweet.text,
-                        'created_at': tweet.created_at,
-                        'public_metrics': tweet.public_metrics,
-                        'author': {
-                            'id': tweet.author_id,
-                            'username': getattr(author, 'username', 'unknown'),
-                            'name': getattr(author, 'name', 'unknown')
-                        },
-                        'context_annotations': getattr(tweet, 'context_annotations', [])
-                    }
-                    tweet_list.append(tweet_data)
-                
+            if tweet_list:
                 logger.info(f"Found {len(tweet_list)} tweets for query: {query}")
                 return tweet_list
             else:
                 logger.warning(f"No tweets found for query: {query}")
                 return []
                 
+        except (tweepy.TooManyRequests, RateLimitExceeded):
+            logger.error("Twitter API: Rate limit exceeded")
+            return None
         except Exception as e:
             logger.error(f"Error searching tweets: {e}")
             return None
     
+    def iter_search_tweets(self, query, start_time, max_results=100, include_rich=False):
+        """Yield recent tweets matching query since start_time, following pagination up to max_results (API errors propagate)"""
+        paginator = tweepy.Paginator(
+            self.client.search_recent_tweets,
+            query=query,
+            start_time=start_time,
+            max_results=min(max_results, 100),  # API limit per page
+            tweet_fields=SEARCH_TWEET_FIELDS + RICH_TWEET_FIELDS if include_rich else SEARCH_TWEET_FIELDS,
+            expansions=['author_id']
+        )
+        
+        # Walk whole pages rather than flatten() so each page's expanded authors are available
+        remaining = max_results
+        for page in paginator:
+            users = {user.id: user for user in page.includes.get('users', [])}
+            
+            for tweet in page.data or []:
+                author = users.get(tweet.author_id, {})
+                yield {
+                    'id': tweet.id,
+                    'text': tweet.text,
+                    'created_at': tweet.created_at,
+                    'public_metrics': tweet.public_metrics,
+                    'author': {
+                        'id': tweet.author_id,
+                        'username': getattr(author, 'username', 'unknown'),
+                        'name': getattr(author, 'name', 'unknown')
+                    },
+                    'context_annotations': getattr(tweet, 'context_annotations', [])
+                }
+                
+                remaining -= 1
+                if remaining <= 0:
+                    return
+    
     def get_hashtag_analytics(self, hashtag, days=7):
         """Get analytics for a specific hashtag"""
         if not hashtag.startswith('#'):
@@ -188,12 +503,24 @@ class TwitterAnalyzer:
         if not tweets:
             return None
         
+        # Sum all metrics and score each tweet (likes + retweets) in one pass
+        total_likes = total_retweets = total_replies = 0
+        scores = []
+        for tweet in tweets:
+            metrics = tweet['public_metrics']
+            likes = metrics['like_count']
+            retweets = metrics['retweet_count']
+            total_likes += likes
+            total_retweets += retweets
+            total_replies += metrics['reply_count']
+            scores.append(likes + retweets)
+        
         analytics = {
             'hashtag': hashtag,
             'total_tweets': len(tweets),
-            'total_likes': sum(tweet['public_metrics']['like_count'] for tweet in tweets),
-            'total_retweets': sum(tweet['public_metrics']['retweet_count'] for tweet in tweets),
-            'total_replies': sum(tweet['public_metrics']['reply_count'] for tweet in tweets),
+            'total_likes': total_likes,
+            'total_retweets': total_retweets,
+            'total_replies': total_replies,
             'avg_engagement': 0,
             'top_tweets': []
         }
@@ -203,12 +530,22 @@ class TwitterAnalyzer:
             total_engagement = analytics['total_likes'] + analytics['total_retweets'] + analytics['total_replies']
             analytics['avg_engagement'] = total_engagement / analytics['total_tweets']
         
-        # Get top performing tweets
-        sorted_tweets = sorted(
-            tweets, 
-            key=lambda x: x['public_metrics']['like_count'] + x['public_metrics']['retweet_count'],
-            reverse=True
-        )
-        analytics['top_tweets'] = sorted_tweets[:5]
+        # Get top performing tweets (same order as a stable descending sort, without sorting all)
+        top_indices = heapq.nlargest(5, range(len(scores)), key=scores.__getitem__)
+        analytics['top_tweets'] = [tweets[i] for i in top_indices]
+        
+        return analytics
+    
+    async def get_hashtags_analytics(self, hashtags, days=7, concurrency=8):
+        """Get analytics for several hashtags concurrently, keyed by hashtag"""
+        # Runs in threads for the same reason as get_many_user_infos; the search
+        # request budget is still enforced per call by the rate limiter
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def analyze(hashtag):
+            async with semaphore:
+                return await asyncio.to_thread(self.get_hashtag_analytics, hashtag, days)
         
-        return analytics
\ No newline at end of file
+        hashtags = list(hashtags)
+        results = await asyncio.gather(*(analyze(hashtag) for hashtag in hashtags))
+        return dict(zip(hashtags, results))
\ No newline at end of file